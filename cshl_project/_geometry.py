@@ -0,0 +1,27 @@
+import functools
+import math
+import numpy as np
+
+@functools.lru_cache(maxsize=4096)
+def _rotation(orientation):
+    _ori_rad = math.radians(orientation)
+    return math.cos(_ori_rad), math.sin(_ori_rad)
+
+def rotation(orientation):
+    """cosine and sine of the orientation (degree), cached for parameter sweeps."""
+    return _rotation(float(orientation))
+
+@functools.lru_cache(maxsize=16)
+def pixel_axis(grid_size, dtype=np.float64):
+    """pixel coordinates (1 to grid_size) relative to the image center, cached and read-only."""
+    _pixel_axis = np.arange(1, grid_size + 1, dtype=dtype) - (1 + grid_size) / 2
+    _pixel_axis.setflags(write=False)
+    return _pixel_axis
+
+@functools.lru_cache(maxsize=16)
+def pixel_grid(grid_size, dtype=np.float64):
+    """x and y pixel coordinates relative to the image center, cached and read-only."""
+    _pixel_dist_X, _pixel_dist_Y = np.meshgrid(pixel_axis(grid_size, dtype), pixel_axis(grid_size, dtype), indexing='xy')
+    _pixel_dist_X.setflags(write=False)
+    _pixel_dist_Y.setflags(write=False)
+    return _pixel_dist_X, _pixel_dist_Y
@@ -1,6 +1,7 @@
 import numpy as np
+from . import _geometry
 
-def make_LGN_linear_filter(grid_size=256, blob_size=5, xc=0, yc=0, eccentricity=0, orientation=0, contrast=1, spatial_scale=1, norm=True):
+def make_LGN_linear_filter(grid_size=256, blob_size=5, xc=0, yc=0, eccentricity=0, orientation=0, contrast=1, spatial_scale=1, norm=True, dtype=np.float32):
     """make the linear filter of the LGN subunit, with compatible size/shape with the grating/plaid image.
     
     ## Arguments
@@ -12,26 +13,28 @@ def make_LGN_linear_filter(grid_size=256, blob_size=5, xc=0, yc=0, eccentricity=
     - contrast: contrast scaler
     - spatial_scale: linear scaler for blob_size (mostly for dev)
     - norm: normalize the gaussian distribution to have 1 as the peak, so the contrast would be set accordingly
+    - dtype: floating point type of the filter [default: np.float32]
     
     ## Returns
     - linear filter in size of [grid_size x grid_size]
     """
-    _pixel_axis = np.linspace(1, grid_size, grid_size)
-    _pixel_dist_X = _pixel_axis.repeat(grid_size).reshape((grid_size, grid_size)).T.reshape((-1,)) - _pixel_axis.mean() - xc
-    _pixel_dist_Y = _pixel_axis.repeat(grid_size).reshape((grid_size, grid_size)).reshape((-1,)) - _pixel_axis.mean() - yc
-    _pixel_dist = np.vstack((_pixel_dist_X, _pixel_dist_Y))
+    _scalar = np.dtype(dtype).type
+    _pixel_dist_X, _pixel_dist_Y = _geometry.pixel_grid(grid_size, dtype)
+    _pixel_dist_X, _pixel_dist_Y = _pixel_dist_X - _scalar(xc), _pixel_dist_Y - _scalar(yc)
     
-    _ori_rad = np.deg2rad(orientation)
-    _ori_Q = np.array([ # counterclockwise rotation transformation matrix
-        [np.cos(_ori_rad), np.sin(_ori_rad)],
-        [-np.sin(_ori_rad), np.cos(_ori_rad)]
-    ])
-    _pixel_dist_rotated = _ori_Q @ _pixel_dist * spatial_scale
+    _cos, _sin = _geometry.rotation(orientation)
+    # counterclockwise rotation of the pixel coordinates
+    _pixel_dist_rotated_X = (_cos * _pixel_dist_X + _sin * _pixel_dist_Y) * _scalar(spatial_scale)
+    _pixel_dist_rotated_Y = (-_sin * _pixel_dist_X + _cos * _pixel_dist_Y) * _scalar(spatial_scale)
     
-    _a = 1/blob_size * spatial_scale #TODO: why inverse?
+    # _a, _b are inverse widths, i.e. exp(-(x*_b)**2/2 - (y*_a)**2/2) has σ_y = blob_size
+    _a = 1/blob_size * spatial_scale
     _b = np.sqrt((1 - eccentricity**2) * _a ** 2)
-    _image = np.exp(-((_pixel_dist_rotated[0])**2 / 2*_b**2 + (_pixel_dist_rotated[1])**2 / 2*_a**2))
+    _a2, _b2 = _scalar(_a * _a), _scalar(_b * _b)
+    _exponent = -0.5 * (_pixel_dist_rotated_X * _pixel_dist_rotated_X * _b2 + _pixel_dist_rotated_Y * _pixel_dist_rotated_Y * _a2)
     if norm:
-        _image = _image / np.max(_image)
-    _image = _image * contrast
-    return _image.reshape(grid_size, grid_size)
\ No newline at end of file
+        # normalize in log space, so the peak stays 1 even when exp underflows (e.g. blob far off the grid)
+        _exponent = _exponent - np.max(_exponent)
+    _image = np.exp(_exponent)
+    _image = _image * _scalar(contrast)
+    return _image
\ No newline at end of file
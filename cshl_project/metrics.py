@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.fft import rfft
 
 class IndexCalc(object):
     """Static class for various indices.
@@ -7,6 +8,7 @@ class IndexCalc(object):
     - `masking_index`
     - `selectivity_index`
     - `F1_modulation`
+    - `F1_modulation_batch`
     """
     @staticmethod
     def masking_index(test, mask, plaid):
@@ -31,6 +33,24 @@ class IndexCalc(object):
     def F1_modulation(response, reference=None, order=1):
         """F1 modulation component using Fourier transform."""
         if reference is None:
-            return np.abs(np.fft.fft(response))[order] / len(response) * 2
+            _n = len(response)
+            _k = order % _n
+            # real signal: |X[k]| == |X[n-k]|, so only the non-negative half spectrum is needed
+            return np.abs(rfft(response)[min(_k, _n - _k)]) / _n * 2
         else:
             return IndexCalc.F1_modulation(response, order=order) / IndexCalc.F1_modulation(reference, order=order)
+    
+    @staticmethod
+    def F1_modulation_batch(responses, reference=None, order=1, workers=-1):
+        """F1 modulation of each row of `responses` [k x n], using one multi-threaded Fourier transform.
+        
+        - reference: `numpy.ndarray` [k x n] or [n] reference response(s) [default: None]
+        - workers: number of threads for `scipy.fft.rfft` [default: -1, all cores]
+        """
+        _responses = np.asarray(responses)
+        if reference is None:
+            _n = _responses.shape[-1]
+            _k = order % _n
+            return np.abs(rfft(_responses, axis=-1, workers=workers)[..., min(_k, _n - _k)]) / _n * 2
+        else:
+            return IndexCalc.F1_modulation_batch(_responses, order=order, workers=workers) / IndexCalc.F1_modulation_batch(reference, order=order, workers=workers)
@@ -1,18 +1,15 @@
 import numpy as np
-def rectification(x):
+def rectification(x, inplace=False):
 	if isinstance(x, np.ndarray):
-		y = np.array(x) # make a copy
-		y[y < 0] = 0
+		y = np.maximum(x, 0, out=x if inplace else None) # single pass, no copy if inplace
 	else:
 		y = 0 if x < 0 else x
 	return y
 
-def relu(x):
-    """rectified linear unit"""
+def relu(x, inplace=False):
+    """rectified linear unit, overwriting `x` if `inplace` and it is a `numpy.ndarray`"""
     if isinstance(x, np.ndarray):
-        y = np.array(x)
-        y[y < 0] = 0
-        return y
+        return np.maximum(x, 0, out=x if inplace else None)
     else: # it should be a builtin number type (int or float)
         return 0 if x < 0 else x
 	
@@ -1,5 +1,30 @@
+import math
+import numba
 import numpy as np
-from .nonlinearity import relu
+from .nonlinearity import relu, rectification
+
+@numba.njit('float64(float64, float64, float64, float64)', cache=True, fastmath=True)
+def _dist_phase_kernel(cx, cy, ori, sf):
+    """spatial phase of a grating at the point (cx, cy), refer to `LGNnode._get_sinusoidal`."""
+    return (cx * math.cos(ori) + cy * math.sin(ori)) / sf * 2 * math.pi
+
+@numba.njit('UniTuple(float64, 2)(float64, float64, float64, float64, float64, float64, float64, float64)', cache=True, fastmath=True)
+def _plaid_kernel(cx, cy, ori1, ori2, contrast1, contrast2, dphase, sf):
+    """phase and contrast of a plaid at the point (cx, cy), refer to `LGNnode._get_sinusoidal_plaid`."""
+    _dist_ϕ_1 = _dist_phase_kernel(cx, cy, ori1, sf)
+    _dist_ϕ_2 = _dist_phase_kernel(cx, cy, ori2, sf) + dphase
+    # sum of the two phasors in real arithmetic
+    _vec_x = contrast1 * math.cos(_dist_ϕ_1) + contrast2 * math.cos(_dist_ϕ_2)
+    _vec_y = contrast1 * math.sin(_dist_ϕ_1) + contrast2 * math.sin(_dist_ϕ_2)
+    return math.atan2(_vec_y, _vec_x), math.hypot(_vec_x, _vec_y)
+
+@numba.guvectorize(['void(float64[:], float64[:], float64[:], float64[:], float64[:], float64[:])'],
+                   '(n),(n),(n),(n),(n)->(n)', nopython=True, cache=True, fastmath=True)
+def _ln_relu_kernel(luminance, contrast, Rmax, C50, Rbase, out):
+    """rectified contrast-gained luminance of each subunit in one pass, refer to `V1node._get_subunit_response`."""
+    for i in range(luminance.shape[0]):
+        _r = (Rmax[i] * contrast[i] / (contrast[i] + C50[i]) + Rbase[i]) * luminance[i]
+        out[i] = _r if _r > 0 else 0.0
 
 class LGNnode(object):
     """LN model for LGN subunits
@@ -69,8 +94,12 @@ class LGNnode(object):
         """return the luminance and contrast level given grating parameters.
         Refer to `LGNnode.get_response_grating` for full documentation.
         """
-        _dist_ϕ = np.array([[np.cos(ori), np.sin(ori)]]) @ self.center / sf * 2 * np.pi
-        _luminance = np.sin(_dist_ϕ[0][0] + phase)
+        _cx, _cy = self.center[0, 0], self.center[1, 0]
+        if np.ndim(ori) == 0 and np.ndim(sf) == 0:
+            _dist_ϕ = _dist_phase_kernel(_cx, _cy, ori, sf)
+        else: # array parameters, broadcast with NumPy
+            _dist_ϕ = (_cx * np.cos(ori) + _cy * np.sin(ori)) / sf * 2 * np.pi
+        _luminance = np.sin(_dist_ϕ + phase)
         return _luminance * 2, contrast
     
     #XXX: check
@@ -83,13 +112,18 @@ class LGNnode(object):
         """return the luminance and contrast level given plaid parameters.
         Refer to `LGNnode.get_response_plaid` for full documentation.
         """
-        _dist_ϕ_1 = np.array([[np.cos(ori1), np.sin(ori1)]]) @ self.center / sf * 2 * np.pi
-        _dist_ϕ_2 = np.array([[np.cos(ori2), np.sin(ori2)]]) @ self.center / sf * 2 * np.pi + Δphase
-        
-        _vec = contrast1 * np.exp(_dist_ϕ_1[0][0] * 1j) + contrast2 * np.exp(_dist_ϕ_2[0][0] * 1j)
-        _luminance = np.sin(np.angle(_vec) + phase)
+        _cx, _cy = self.center[0, 0], self.center[1, 0]
+        if all(np.ndim(item) == 0 for item in (ori1, ori2, contrast1, contrast2, Δphase, sf)):
+            _vec_ϕ, _vec_c = _plaid_kernel(_cx, _cy, ori1, ori2, contrast1, contrast2, Δphase, sf)
+        else: # array parameters, broadcast with NumPy
+            _dist_ϕ_1 = (_cx * np.cos(ori1) + _cy * np.sin(ori1)) / sf * 2 * np.pi
+            _dist_ϕ_2 = (_cx * np.cos(ori2) + _cy * np.sin(ori2)) / sf * 2 * np.pi + Δphase
+            _vec_x = contrast1 * np.cos(_dist_ϕ_1) + contrast2 * np.cos(_dist_ϕ_2)
+            _vec_y = contrast1 * np.sin(_dist_ϕ_1) + contrast2 * np.sin(_dist_ϕ_2)
+            _vec_ϕ, _vec_c = np.arctan2(_vec_y, _vec_x), np.hypot(_vec_x, _vec_y)
+        _luminance = np.sin(_vec_ϕ + phase)
 
-        return _luminance * 2, np.abs(_vec)
+        return _luminance * 2, _vec_c
     
     def get_response_grating(self, *args, **kwargs):
         """calculate the linear-nonlinear response of subunit to sinusoidal grating stimulus.
@@ -146,8 +180,45 @@ class V1node(object):
         super(V1node, self).__init__()
         self.subunits = subunits
         self.nonlinear = nl
+        self._compiled = None
+    
+    def _compile(self):
+        """stack the subunit parameters into contiguous arrays for the vectorized response.
+        
+        Rebuilt lazily whenever any subunit, its center, `Rmax`, `C50`, `Rbase` or nonlinearity changes.
+        """
+        _key = tuple((id(item), float(item.center[0, 0]), float(item.center[1, 0]),
+                      float(item.Rmax), float(item.C50), float(item.Rbase), item.nonlinear) for item in self.subunits)
+        if self._compiled == _key:
+            return
+        self._cx = np.array([item.center[0, 0] for item in self.subunits], dtype=float)
+        self._cy = np.array([item.center[1, 0] for item in self.subunits], dtype=float)
+        self._Rmax = np.array([item.Rmax for item in self.subunits], dtype=float)
+        self._C50 = np.array([item.C50 for item in self.subunits], dtype=float)
+        self._Rbase = np.array([item.Rbase for item in self.subunits], dtype=float)
+        self._nonlinears = [item.nonlinear for item in self.subunits]
+        self._fused = set(self._nonlinears) <= {relu, rectification}
+        self._compiled = _key
+    
+    def _get_subunit_response(self, luminance, contrast):
+        """LN response of all subunits, in size of [length x N subunits].
+        
+        Arguments:
+        - luminance: `numpy.ndarray` luminance of each subunit [length x N]
+        - contrast: `real` or `numpy.ndarray` contrast level of each subunit [N]
+        """
+        if self._fused: # fused kernel, no intermediate arrays
+            _contrast = np.broadcast_to(np.asarray(contrast, dtype=float), self._Rmax.shape)
+            return _ln_relu_kernel(luminance, _contrast, self._Rmax, self._C50, self._Rbase)
+        
+        _linear = (self._Rmax * contrast / (contrast + self._C50) + self._Rbase) * luminance
+        if len(set(self._nonlinears)) == 1:
+            return self._nonlinears[0](_linear)
+        else: # subunits with different nonlinearities
+            return np.stack([nl(_linear[:, i], inplace=True) if nl in (relu, rectification) else nl(_linear[:, i])
+                             for i, nl in enumerate(self._nonlinears)], axis=1)
             
-    def get_response_grating(self, length=720, phase=0, **kwargs):
+    def get_response_grating(self, length=720, phase=0, ori=0, contrast=0.48, sf=50):
         """LN resposne to the convergent inputs from LGN subunits to sinusoidal grating stimulus.
         
         Return the response of one full cycle of grating stimulus given parameters.
@@ -155,15 +226,15 @@ class V1node(object):
         Keyword Arguments:
         - length: `int` total steps for simulating the full cycle [default: 720]
         - phase: `real` the initial phase value [default: 0]
-        - **kwargs: refer to `LGNnode.get_response_grating` for full documentation.
+        - ori, contrast, sf: refer to `LGNnode.get_response_grating` for full documentation.
         """
-        _resp = np.zeros(length)
+        self._compile()
         _step = np.linspace(0, 2*np.pi*(1-1/length), length)
-        for item in self.subunits:
-            _resp += item.get_response_grating(phase=_step+phase, **kwargs)
-        return _resp / len(self.subunits)
+        _dist_ϕ = (np.cos(ori) * self._cx + np.sin(ori) * self._cy) / sf * 2 * np.pi
+        _luminance = np.sin(_step[:, None] + phase + _dist_ϕ[None, :]) * 2
+        return self._get_subunit_response(_luminance, contrast).mean(axis=1)
     
-    def get_response_plaid(self, length=720, phase=0, **kwargs):
+    def get_response_plaid(self, length=720, phase=0, ori1=0, ori2=0, contrast1=0.48, contrast2=0.48, Δphase=0, sf=50):
         """LN resposne to the convergent inputs from LGN subunits to sinusoidal plaid stimulus.
         
         Return the response of one full cycle of plaid stimulus given parameters.
@@ -171,10 +242,15 @@ class V1node(object):
         Keyword Arguments:
         - length: `int` total steps for simulating the full cycle [default: 720]
         - phase: `real` the initial phase value [default: 0]
-        - **kwargs: refer to `LGNnode.get_response_grating` for full documentation.
+        - ori1, ori2, contrast1, contrast2, Δphase, sf: refer to `LGNnode.get_response_plaid` for full documentation.
         """
-        _resp = np.zeros(length)
+        self._compile()
         _step = np.linspace(0, 2*np.pi*(1-1/length), length)
-        for item in self.subunits:
-            _resp += item.get_response_plaid(phase=_step+phase, **kwargs)
-        return _resp / len(self.subunits)
+        _dist_ϕ_1 = (np.cos(ori1) * self._cx + np.sin(ori1) * self._cy) / sf * 2 * np.pi
+        _dist_ϕ_2 = (np.cos(ori2) * self._cx + np.sin(ori2) * self._cy) / sf * 2 * np.pi + Δphase
+        
+        # sum of the two phasors in real arithmetic
+        _vec_x = contrast1 * np.cos(_dist_ϕ_1) + contrast2 * np.cos(_dist_ϕ_2)
+        _vec_y = contrast1 * np.sin(_dist_ϕ_1) + contrast2 * np.sin(_dist_ϕ_2)
+        _luminance = np.sin(_step[:, None] + phase + np.arctan2(_vec_y, _vec_x)[None, :]) * 2
+        return self._get_subunit_response(_luminance, np.hypot(_vec_x, _vec_y)).mean(axis=1)
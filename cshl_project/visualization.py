@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from . import _geometry
 
 def plot_matrix_as_image(matrix, **kwargs):
 	fig, ax = plt.subplots(1, 1)
@@ -42,17 +43,12 @@ def make_gaussian_contour(grid_size=256, blob_size=5, xc=0, yc=0, eccentricity=0
     _x = np.cos(_θ) * _a
     _y = np.sin(_θ) * _b
     
-    _ori_rad = np.deg2rad(orientation)
-    _ori_Q = np.array([
-        [np.cos(_ori_rad), -np.sin(_ori_rad)],
-        [np.sin(_ori_rad), np.cos(_ori_rad)]
-    ])
-    # print(_ori_Q)
+    _cos, _sin = _geometry.rotation(orientation)
+    # counterclockwise rotation, inlined 2x2 matrix product
+    _contour_x = (_cos * _x - _sin * _y) * spatial_scale + (xc + _center_x)
+    _contour_y = (_sin * _x + _cos * _y) * spatial_scale + (yc + _center_y)
     
-    _contour = _ori_Q @ np.vstack((_x, _y)) * spatial_scale + np.array([[xc+_center_x], [yc+_center_y]])
-    # print(np.vstack((_x, _y)).shape)
-    
-    return _contour[0], _contour[1] 
+    return _contour_x, _contour_y
     
 def plot_ellipse_contour(ax, plot_param={}, **kwargs):
 	ax.plot(*make_gaussian_contour(**kwargs), **plot_param)